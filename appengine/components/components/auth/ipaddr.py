@@ -28,6 +28,12 @@ IP = collections.namedtuple('IP', ['bits', 'value'])
 # Parsed IPv4 or IPv6 subnet. 'bits' is 32 for IPv4 and 128 for IPv6,
 Subnet = collections.namedtuple('Subnet', ['bits', 'base', 'mask'])
 
+# Cache of subnet string -> Subnet used by subnet_from_string(). Whitelists are
+# checked on every request coming from a bot so it is worth not reparsing the
+# same strings over and over. It is flushed when it grows past _MAX_CACHE.
+_SUBNET_CACHE = {}
+_MAX_CACHE = 1024
+
 
 def ip_from_string(ipstr):
   """Parses IPv4 or IPv6 string and returns an instance of IP.
@@ -103,6 +109,17 @@ def subnet_from_string(subnet):
 
   Raises ValueError if |subnet| is not recognized as IPv4 or IPv6 subnet.
   """
+  result = _SUBNET_CACHE.get(subnet)
+  if result is None:
+    if len(_SUBNET_CACHE) >= _MAX_CACHE:
+      _SUBNET_CACHE.clear()
+    result = _parse_subnet(subnet)
+    _SUBNET_CACHE[subnet] = result
+  return result
+
+
+def _parse_subnet(subnet):
+  """Implementation of subnet_from_string() without the cache."""
   # Accept single IPs too.
   if '/' not in subnet:
     base_ip = ip_from_string(subnet)
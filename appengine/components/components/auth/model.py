@@ -797,8 +797,7 @@ class AuthIPWhitelist(ndb.Model, datastore_utils.SerializableModelMixin):
 
   def is_ip_whitelisted(self, ip):
     """Returns True if ipaddr.IP is in the whitelist."""
-    # TODO(vadimsh): If number of subnets to check grows it makes sense to add
-    # an internal cache to 'subnet_from_string' (sort of like in re.compile).
+    # 'subnet_from_string' caches parsed subnets, so it is cheap to call here.
     return any(
         ipaddr.is_in_subnet(ip, ipaddr.subnet_from_string(net))
         for net in self.subnets)
@@ -125,6 +125,20 @@ class IpAddrTest(test_case.TestCase):
     with self.assertRaises(ValueError):
       ipaddr.subnet_from_string('127.0.0.1/33')
 
+  def test_subnet_from_string_cached(self):
+    self.mock(ipaddr, '_SUBNET_CACHE', {})
+    self.mock(ipaddr, '_MAX_CACHE', 2)
+    first = ipaddr.subnet_from_string('127.0.0.1/8')
+    self.assertIs(first, ipaddr.subnet_from_string('127.0.0.1/8'))
+    self.assertEqual(['127.0.0.1/8'], ipaddr._SUBNET_CACHE.keys())
+    ipaddr.subnet_from_string('10.0.0.1')
+    ipaddr.subnet_from_string('10.0.0.2')
+    # The cache was flushed when it got full.
+    self.assertEqual(['10.0.0.2'], ipaddr._SUBNET_CACHE.keys())
+    with self.assertRaises(ValueError):
+      ipaddr.subnet_from_string('256.0.0.1')
+    self.assertEqual(['10.0.0.2'], ipaddr._SUBNET_CACHE.keys())
+
   def test_subnet_to_string_v4(self):
     call = lambda base, mask: (
         ipaddr.subnet_to_string(ipaddr.Subnet(32, base, mask)))
@@ -238,6 +238,9 @@ class TaskProperties(ndb.Model):
   # task.
   idempotent = ndb.BooleanProperty(default=False)
 
+  # Memoized value of properties_hash. Not a datastore property.
+  _properties_hash_cache = None
+
   @property
   def properties_hash(self):
     """Calculates the hash for this entity IFF the task is idempotent.
@@ -245,12 +248,18 @@ class TaskProperties(ndb.Model):
     It uniquely identifies the TaskProperties instance to permit deduplication
     by the task scheduler. It is None if the task is not idempotent.
 
+    The hash is calculated once per instance since the model is immutable; it
+    is read multiple times while scheduling and deduping a task.
+
     Returns:
       Hash as a compact byte str.
     """
     if not self.idempotent:
       return None
-    return self.HASHING_ALGO(utils.encode_to_json(self)).digest()
+    if self._properties_hash_cache is None:
+      self._properties_hash_cache = self.HASHING_ALGO(
+          utils.encode_to_json(self)).digest()
+    return self._properties_hash_cache
 
 
 class TaskRequest(ndb.Model):
@@ -356,7 +365,12 @@ def _new_request_key():
     raise ValueError(
         'Time %s is set to before %s' % (utcnow, _BEGINING_OF_THE_WORLD))
   delta = utcnow - _BEGINING_OF_THE_WORLD
-  now = int(round(delta.total_seconds() * 1000.))
+  # Use integer arithmetic, rounded to the nearest ms, instead of going through
+  # the float returned by timedelta.total_seconds(). Keep using utils.utcnow()
+  # so the time can be mocked.
+  now = (
+      (delta.days * 24*60*60 + delta.seconds) * 1000 +
+      (delta.microseconds + 500) // 1000)
   # TODO(maruel): Use real randomness.
   suffix = random.getrandbits(16)
   task_id = int((now << 20) | (suffix << 4) | 0x1)
@@ -377,9 +391,9 @@ def _put_request(request):
 
 def _assert_keys(expected_keys, minimum_keys, actual_keys, name):
   """Raise an exception if expected keys are not present."""
-  actual_keys = frozenset(actual_keys)
-  superfluous = actual_keys - expected_keys
-  missing = minimum_keys - actual_keys
+  # Do not create a temporary frozenset out of actual_keys, it is a dict.
+  superfluous = [k for k in actual_keys if k not in expected_keys]
+  missing = minimum_keys.difference(actual_keys)
   if superfluous or missing:
     msg_missing = (
         ('Missing: %s\n' % ', '.join(sorted(missing))) if missing else '')
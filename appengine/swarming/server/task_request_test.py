@@ -4,6 +4,7 @@
 # found in the LICENSE file.
 
 import datetime
+import hashlib
 import logging
 import os
 import random
@@ -244,6 +245,20 @@ class TaskRequestApiTest(TestCase):
         request_2.properties.properties_hash)
     self.assertTrue(request_1.properties.properties_hash)
 
+  def test_properties_hash_memoized(self):
+    request = task_request.make_request(
+        _gen_request_data(properties=dict(idempotent=True)))
+    calls = []
+    def hash_algo(data):
+      calls.append(data)
+      return hashlib.sha1(data)
+    self.mock(
+        task_request.TaskProperties, 'HASHING_ALGO', staticmethod(hash_algo))
+    request.properties._properties_hash_cache = None
+    expected = request.properties.properties_hash
+    self.assertEqual(expected, request.properties.properties_hash)
+    self.assertEqual(1, len(calls))
+
   def test_different(self):
     # Two TestRequest with different properties.
     request_1 = task_request.make_request(
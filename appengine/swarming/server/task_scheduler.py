@@ -33,6 +33,10 @@ from server import task_to_run
 
 _PROBABILITY_OF_QUICK_COMEBACK = 0.05
 
+# Maximum number of dead bot tasks to process concurrently in
+# cron_handle_bot_died().
+_DEAD_BOT_BATCH_SIZE = 20
+
 
 def _secs_to_ms(value):
   """Converts a seconds value in float to the number of ms as an integer."""
@@ -151,15 +155,16 @@ def _update_stats(run_result, bot_id, request, completed):
         dimensions=request.properties.dimensions)
 
 
-def _handle_dead_bot(run_result_key):
+@ndb.tasklet
+def _handle_dead_bot_async(run_result_key):
   """Handles TaskRunResult where its bot has stopped showing sign of life.
 
   Transactionally updates the entities depending on the state of this task. The
   task may be retried automatically, canceled or left alone.
 
   Returns:
-    True if the task was retried, False if the task was killed, None if no
-    action was done.
+    ndb.Future that resolves to True if the task was retried, False if the task
+    was killed, None if no action was done.
   """
   result_summary_key = task_pack.run_result_key_to_result_summary_key(
       run_result_key)
@@ -168,17 +173,18 @@ def _handle_dead_bot(run_result_key):
   now = utils.utcnow()
   server_version = utils.get_app_version()
   packed = task_pack.pack_run_result_key(run_result_key)
-  request = request_future.get_result()
+  request = yield request_future
   to_run_key = task_to_run.request_to_task_to_run_key(request)
 
+  @ndb.tasklet
   def run():
     """Returns tuple(Result, bot_id)."""
     # Do one GET, one PUT at the end.
-    run_result, result_summary, to_run = ndb.get_multi(
+    run_result, result_summary, to_run = yield ndb.get_multi_async(
         (run_result_key, result_summary_key, to_run_key))
     if run_result.state != task_result.State.RUNNING:
       # It was updated already or not updating last. Likely DB index was stale.
-      return None, run_result.bot_id
+      raise ndb.Return((None, run_result.bot_id))
 
     run_result.signal_server_version(server_version)
     if result_summary.try_number != run_result.try_number:
@@ -209,11 +215,11 @@ def _handle_dead_bot(run_result_key):
       run_result.abandoned_ts = now
       result_summary.set_from_run_result(run_result, request)
       result = False
-    ndb.put_multi(to_put)
-    return result, run_result.bot_id
+    yield ndb.put_multi_async(to_put)
+    raise ndb.Return((result, run_result.bot_id))
 
   try:
-    success, bot_id = datastore_utils.transaction(run)
+    success, bot_id = yield datastore_utils.transaction_async(run)
   except datastore_utils.CommitError:
     success, bot_id = None, None
   if success is not None:
@@ -228,7 +234,7 @@ def _handle_dead_bot(run_result_key):
       logging.info('Retried %s', packed)
   else:
     logging.info('Ignored %s', packed)
-  return success
+  raise ndb.Return(success)
 
 
 def _copy_entity(src, dst, skip_list):
@@ -681,15 +687,30 @@ def cron_handle_bot_died():
   ignored = 0
   killed = 0
   retried = 0
+  futures = []
   try:
-    for run_result_key in task_result.yield_run_result_keys_with_dead_bot():
-      result = _handle_dead_bot(run_result_key)
-      if result is True:
-        retried += 1
-      elif result is False:
-        killed += 1
-      else:
-        ignored += 1
+    # Handle the tasks concurrently, by batches, so the RPCs of multiple
+    # transactions overlap.
+    keys = iter(task_result.yield_run_result_keys_with_dead_bot())
+    while True:
+      for run_result_key in keys:
+        futures.append(_handle_dead_bot_async(run_result_key))
+        if len(futures) == _DEAD_BOT_BATCH_SIZE:
+          break
+      if not futures:
+        break
+      # Wait for the whole batch even if one of them throws, so no transaction
+      # is left pending.
+      ndb.Future.wait_all(futures)
+      for future in futures:
+        result = future.get_result()
+        if result is True:
+          retried += 1
+        elif result is False:
+          killed += 1
+        else:
+          ignored += 1
+      del futures[:]
   finally:
     # TODO(maruel): Use stats_framework.
     logging.info('Killed %d; retried %d; ignored: %d', killed, retried, ignored)
@@ -66,6 +66,70 @@ def _gen_request_data(name='Request name', properties=None, **kwargs):
   return base_data
 
 
+def _gen_result_summary(**kwargs):
+  """Returns the expected TaskResultSummary.to_dict() for a common task."""
+  out = {
+    'abandoned_ts': None,
+    'bot_id': u'localhost',
+    'bot_version': u'abc',
+    'children_task_ids': [],
+    'completed_ts': None,
+    'costs_usd': [0.],
+    'cost_saved_usd': None,
+    'created_ts': None,
+    'deduped_from': None,
+    'durations': [],
+    'exit_codes': [],
+    'failure': False,
+    'id': '1d69b9f088008810',
+    'internal_failure': False,
+    'modified_ts': None,
+    'name': u'Request name',
+    'properties_hash': None,
+    'server_versions': [u'default-version'],
+    'started_ts': None,
+    'state': None,
+    'try_number': 1,
+    'user': u'Jesus',
+  }
+  assert set(out).issuperset(kwargs), kwargs
+  out.update(kwargs)
+  return out
+
+
+def _gen_run_result(**kwargs):
+  """Returns the expected TaskRunResult.to_dict() for a common task."""
+  out = {
+    'abandoned_ts': None,
+    'bot_id': u'localhost',
+    'bot_version': u'abc',
+    'children_task_ids': [],
+    'completed_ts': None,
+    'cost_usd': 0.,
+    'durations': [],
+    'exit_codes': [],
+    'failure': False,
+    'id': '1d69b9f088008811',
+    'internal_failure': False,
+    'modified_ts': None,
+    'server_versions': [u'default-version'],
+    'started_ts': None,
+    'state': None,
+    'try_number': 1,
+  }
+  assert set(out).issuperset(kwargs), kwargs
+  out.update(kwargs)
+  return out
+
+
+# Dimensions of the bot used to reap the Windows-3.1.1 tasks.
+_BOT_DIMENSIONS = {
+  u'OS': [u'Windows', u'Windows-3.1.1'],
+  u'hostname': u'localhost',
+  u'foo': u'bar',
+}
+
+
 def get_results(request_key):
   """Fetches all task results for a specified TaskRequest ndb.Key.
 
@@ -132,13 +196,8 @@ class TaskSchedulerApiTest(test_case.TestCase):
         properties=dict(dimensions={u'OS': u'Windows-3.1.1'}))
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     actual_request, run_result  = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(request, actual_request)
     self.assertEqual('localhost', run_result.bot_id)
     self.assertEqual(None, task_to_run.TaskToRun.query().get().queue_number)
@@ -172,19 +231,20 @@ class TaskSchedulerApiTest(test_case.TestCase):
         lambda: task_scheduler._PROBABILITY_OF_QUICK_COMEBACK - 0.01)
     self.assertEqual(1.0, task_scheduler.exponential_backoff(235))
 
-  def _task_ran_successfully(self):
-    """Runs a task successfully and returns the task_id."""
+  def _schedule(self, **kwargs):
+    """Schedules an idempotent task and returns its TaskRequest."""
     data = _gen_request_data(
-        properties=dict(dimensions={u'OS': u'Windows-3.1.1'}, idempotent=True))
+        properties=dict(dimensions={u'OS': u'Windows-3.1.1'}, idempotent=True),
+        **kwargs)
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
+    return request
+
+  def _task_ran_successfully(self):
+    """Runs a task successfully and returns the task_id."""
+    request = self._schedule()
     actual_request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(request, actual_request)
     self.assertEqual('localhost', run_result.bot_id)
     self.assertEqual(None, task_to_run.TaskToRun.query().get().queue_number)
@@ -198,49 +258,32 @@ class TaskSchedulerApiTest(test_case.TestCase):
 
   def _task_deduped(
       self, new_ts, deduped_from, task_id='1d8dc670a0008810', now=None):
-    data = _gen_request_data(
-        name='yay',
-        user='Raoul',
-        properties=dict(dimensions={u'OS': u'Windows-3.1.1'}, idempotent=True))
-    request = task_request.make_request(data)
-    _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
+    request = self._schedule(name='yay', user='Raoul')
+    # The task was deduped when scheduled, it was never enqueued.
     self.assertEqual(None, task_to_run.TaskToRun.query().get().queue_number)
     actual_request_2, run_result_2 = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(None, actual_request_2)
     result_summary_duped, run_results_duped = get_results(request.key)
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': now or self.now,
-      'costs_usd': [],
-      'cost_saved_usd': 0.1,
-      'created_ts': new_ts,
-      'deduped_from': deduped_from,
-      'durations': [0.1],
-      'exit_codes': [0],
-      'failure': False,
-      'id': task_id,
-      'internal_failure': False,
-      # Only this value is updated to 'now', the rest uses the previous run
-      # timestamps.
-      'modified_ts': new_ts,
-      'name': u'yay',
-      # A deduped task cannot be deduped against.
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': now or self.now,
-      'state': State.COMPLETED,
-      'try_number': 0,
-      'user': u'Raoul',
-    }
+    expected = _gen_result_summary(
+        completed_ts=now or self.now,
+        costs_usd=[],
+        cost_saved_usd=0.1,
+        created_ts=new_ts,
+        deduped_from=deduped_from,
+        durations=[0.1],
+        exit_codes=[0],
+        id=task_id,
+        # Only this value is updated to 'now', the rest uses the previous run
+        # timestamps.
+        modified_ts=new_ts,
+        name=u'yay',
+        # A deduped task cannot be deduped against.
+        properties_hash=None,
+        started_ts=now or self.now,
+        state=State.COMPLETED,
+        try_number=0,
+        user=u'Raoul')
     self.assertEqual(expected, result_summary_duped.to_dict())
     self.assertEqual([], run_results_duped)
 
@@ -347,30 +390,15 @@ class TaskSchedulerApiTest(test_case.TestCase):
     # The TaskRequest was enqueued, the TaskResultSummary was created but no
     # TaskRunResult exist yet since the task was not scheduled on any bot.
     result_summary, run_results = get_results(request.key)
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': None,
-      'bot_version': None,
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [],
-      'cost_saved_usd': None,
-      'created_ts': created_ts,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': created_ts,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [],
-      'started_ts': None,
-      'state': State.PENDING,
-      'try_number': None,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        bot_id=None,
+        bot_version=None,
+        costs_usd=[],
+        created_ts=created_ts,
+        modified_ts=created_ts,
+        server_versions=[],
+        state=State.PENDING,
+        try_number=None)
     self.assertEqual(expected, result_summary.to_dict())
     self.assertEqual([], run_results)
 
@@ -382,50 +410,17 @@ class TaskSchedulerApiTest(test_case.TestCase):
     self.assertEqual(request, reaped_request)
     self.assertTrue(run_result)
     result_summary, run_results = get_results(request.key)
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0.],
-      'cost_saved_usd': None,
-      'created_ts': created_ts,  # Time the TaskRequest was created.
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': reaped_ts,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': reaped_ts,
-      'state': State.RUNNING,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        created_ts=created_ts,  # Time the TaskRequest was created.
+        modified_ts=reaped_ts,
+        started_ts=reaped_ts,
+        state=State.RUNNING)
     self.assertEqual(expected, result_summary.to_dict())
     expected = [
-      {
-        'abandoned_ts': None,
-        'bot_id': u'localhost',
-        'bot_version': u'abc',
-        'children_task_ids': [],
-        'completed_ts': None,
-        'cost_usd': 0.,
-        'durations': [],
-        'exit_codes': [],
-        'failure': False,
-        'id': '1d69b9f088008811',
-        'internal_failure': False,
-        'modified_ts': reaped_ts,
-        'server_versions': [u'default-version'],
-        'started_ts': reaped_ts,
-        'state': State.RUNNING,
-        'try_number': 1,
-      },
+      _gen_run_result(
+          modified_ts=reaped_ts,
+          started_ts=reaped_ts,
+          state=State.RUNNING),
     ]
     self.assertEqual(expected, [i.to_dict() for i in run_results])
 
@@ -442,50 +437,25 @@ class TaskSchedulerApiTest(test_case.TestCase):
         task_scheduler.bot_update_task(
         run_result.key, 'localhost', 'Bar22', 0, 0, 0.2, False, False, 0.1))
     result_summary, run_results = get_results(request.key)
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': done_ts,
-      'costs_usd': [0.1],
-      'cost_saved_usd': None,
-      'created_ts': created_ts,
-      'deduped_from': None,
-      'durations': [0.1, 0.2],
-      'exit_codes': [0, 0],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': done_ts,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': reaped_ts,
-      'state': State.COMPLETED,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        completed_ts=done_ts,
+        costs_usd=[0.1],
+        created_ts=created_ts,
+        durations=[0.1, 0.2],
+        exit_codes=[0, 0],
+        modified_ts=done_ts,
+        started_ts=reaped_ts,
+        state=State.COMPLETED)
     self.assertEqual(expected, result_summary.to_dict())
     expected = [
-      {
-        'abandoned_ts': None,
-        'bot_id': u'localhost',
-        'bot_version': u'abc',
-        'children_task_ids': [],
-        'completed_ts': done_ts,
-        'cost_usd': 0.1,
-        'durations': [0.1, 0.2],
-        'exit_codes': [0, 0],
-        'failure': False,
-        'id': '1d69b9f088008811',
-        'internal_failure': False,
-        'modified_ts': done_ts,
-        'server_versions': [u'default-version'],
-        'started_ts': reaped_ts,
-        'state': State.COMPLETED,
-        'try_number': 1,
-      },
+      _gen_run_result(
+          completed_ts=done_ts,
+          cost_usd=0.1,
+          durations=[0.1, 0.2],
+          exit_codes=[0, 0],
+          modified_ts=done_ts,
+          started_ts=reaped_ts,
+          state=State.COMPLETED),
     ]
     self.assertEqual(expected, [t.to_dict() for t in run_results])
 
@@ -504,51 +474,28 @@ class TaskSchedulerApiTest(test_case.TestCase):
         run_result.key, 'localhost', 'Foo1', 0, 1, 0.1, False, False, 0.1))
     result_summary, run_results = get_results(request.key)
 
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': self.now,
-      'costs_usd': [0.1],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [0.1],
-      'exit_codes': [1],
-      'failure': True,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': self.now,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': State.COMPLETED,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        completed_ts=self.now,
+        costs_usd=[0.1],
+        created_ts=self.now,
+        durations=[0.1],
+        exit_codes=[1],
+        failure=True,
+        modified_ts=self.now,
+        started_ts=self.now,
+        state=State.COMPLETED)
     self.assertEqual(expected, result_summary.to_dict())
 
     expected = [
-      {
-        'abandoned_ts': None,
-        'bot_id': u'localhost',
-        'bot_version': u'abc',
-        'children_task_ids': [],
-        'completed_ts': self.now,
-        'cost_usd': 0.1,
-        'durations': [0.1],
-        'exit_codes': [1],
-        'failure': True,
-        'id': '1d69b9f088008811',
-        'internal_failure': False,
-        'modified_ts': self.now,
-        'server_versions': [u'default-version'],
-        'started_ts': self.now,
-        'state': State.COMPLETED,
-        'try_number': 1,
-      },
+      _gen_run_result(
+          completed_ts=self.now,
+          cost_usd=0.1,
+          durations=[0.1],
+          exit_codes=[1],
+          failure=True,
+          modified_ts=self.now,
+          started_ts=self.now,
+          state=State.COMPLETED),
     ]
     self.assertEqual(expected, [t.to_dict() for t in run_results])
 
@@ -609,50 +556,27 @@ class TaskSchedulerApiTest(test_case.TestCase):
         (True, True),
         task_scheduler.bot_update_task(
             run_result.key, 'localhost', 'hi', 0, 0, 0.1, hard, io, 0.1))
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': self.now,
-      'costs_usd': [0.1],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [0.1],
-      'exit_codes': [0],
-      'failure': True,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': self.now,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': State.TIMED_OUT,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        completed_ts=self.now,
+        costs_usd=[0.1],
+        created_ts=self.now,
+        durations=[0.1],
+        exit_codes=[0],
+        failure=True,
+        modified_ts=self.now,
+        started_ts=self.now,
+        state=State.TIMED_OUT)
     self.assertEqual(expected, result_summary.key.get().to_dict())
 
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': self.now,
-      'cost_usd': 0.1,
-      'durations': [0.1],
-      'exit_codes': [0],
-      'failure': True,
-      'id': '1d69b9f088008811',
-      'internal_failure': False,
-      'modified_ts': self.now,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': State.TIMED_OUT,
-      'try_number': 1,
-    }
+    expected = _gen_run_result(
+        completed_ts=self.now,
+        cost_usd=0.1,
+        durations=[0.1],
+        exit_codes=[0],
+        failure=True,
+        modified_ts=self.now,
+        started_ts=self.now,
+        state=State.TIMED_OUT)
     self.assertEqual(expected, run_result.key.get().to_dict())
 
   def test_bot_update_hard_timeout(self):
@@ -672,49 +596,20 @@ class TaskSchedulerApiTest(test_case.TestCase):
 
     self.assertEqual(
         None, task_scheduler.bot_kill_task(run_result.key, 'localhost'))
-    expected = {
-      'abandoned_ts': self.now,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0.],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': True,
-      'modified_ts': self.now,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': State.BOT_DIED,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        abandoned_ts=self.now,
+        created_ts=self.now,
+        internal_failure=True,
+        modified_ts=self.now,
+        started_ts=self.now,
+        state=State.BOT_DIED)
     self.assertEqual(expected, result_summary.key.get().to_dict())
-    expected = {
-      'abandoned_ts': self.now,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'cost_usd': 0.,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008811',
-      'internal_failure': True,
-      'modified_ts': self.now,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': State.BOT_DIED,
-      'try_number': 1,
-    }
+    expected = _gen_run_result(
+        abandoned_ts=self.now,
+        internal_failure=True,
+        modified_ts=self.now,
+        started_ts=self.now,
+        state=State.BOT_DIED)
     self.assertEqual(expected, run_result.key.get().to_dict())
 
   def test_bot_kill_task_wrong_bot(self):
@@ -764,30 +659,16 @@ class TaskSchedulerApiTest(test_case.TestCase):
     abandoned_ts = self.mock_now(self.now, data['scheduling_expiration_secs']+1)
     self.assertEqual(1, task_scheduler.cron_abort_expired_task_to_run())
     self.assertEqual([], task_result.TaskRunResult.query().fetch())
-    expected = {
-      'abandoned_ts': abandoned_ts,
-      'bot_id': None,
-      'bot_version': None,
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': abandoned_ts,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [],
-      'started_ts': None,
-      'state': task_result.State.EXPIRED,
-      'try_number': None,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        abandoned_ts=abandoned_ts,
+        bot_id=None,
+        bot_version=None,
+        costs_usd=[],
+        created_ts=self.now,
+        modified_ts=abandoned_ts,
+        server_versions=[],
+        state=task_result.State.EXPIRED,
+        try_number=None)
     self.assertEqual(expected, result_summary.key.get().to_dict())
 
   def test_cron_abort_expired_task_to_run_retry(self):
@@ -799,13 +680,8 @@ class TaskSchedulerApiTest(test_case.TestCase):
     result_summary = task_scheduler.schedule_request(request)
 
     # Fake first try bot died.
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     now_1 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 1)
     self.assertEqual((0, 1, 0), task_scheduler.cron_handle_bot_died())
     self.assertEqual(task_result.State.BOT_DIED, run_result.key.get().state)
@@ -816,30 +692,13 @@ class TaskSchedulerApiTest(test_case.TestCase):
     abandoned_ts = self.mock_now(self.now, data['scheduling_expiration_secs']+1)
     self.assertEqual(1, task_scheduler.cron_abort_expired_task_to_run())
     self.assertEqual(1, len(task_result.TaskRunResult.query().fetch()))
-    expected = {
-      'abandoned_ts': abandoned_ts,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0.],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': True,
-      'modified_ts': abandoned_ts,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': task_result.State.BOT_DIED,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        abandoned_ts=abandoned_ts,
+        created_ts=self.now,
+        internal_failure=True,
+        modified_ts=abandoned_ts,
+        started_ts=self.now,
+        state=task_result.State.BOT_DIED)
     self.assertEqual(expected, result_summary.key.get().to_dict())
 
   def test_cron_handle_bot_died(self):
@@ -850,68 +709,31 @@ class TaskSchedulerApiTest(test_case.TestCase):
         scheduling_expiration_secs=600)
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(1, run_result.try_number)
     self.assertEqual(task_result.State.RUNNING, run_result.state)
     now_1 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 1)
     self.assertEqual((0, 1, 0), task_scheduler.cron_handle_bot_died())
 
     # Refresh and compare:
-    expected = {
-      'abandoned_ts': now_1,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'cost_usd': 0.,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008811',
-      'internal_failure': True,
-      'modified_ts': now_1,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': task_result.State.BOT_DIED,
-      'try_number': 1,
-    }
+    expected = _gen_run_result(
+        abandoned_ts=now_1,
+        internal_failure=True,
+        modified_ts=now_1,
+        started_ts=self.now,
+        state=task_result.State.BOT_DIED)
     self.assertEqual(expected, run_result.key.get().to_dict())
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0.],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': now_1,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': None,
-      'state': task_result.State.PENDING,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        created_ts=self.now,
+        modified_ts=now_1,
+        state=task_result.State.PENDING)
     self.assertEqual(expected, run_result.result_summary_key.get().to_dict())
 
     # Task was retried.
     now_2 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 2)
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost-second', 'abc')
+        _BOT_DIMENSIONS, 'localhost-second', 'abc')
     logging.info('%s', [t.to_dict() for t in task_to_run.TaskToRun.query()])
     self.assertEqual(2, run_result.try_number)
     self.assertEqual(
@@ -919,30 +741,17 @@ class TaskSchedulerApiTest(test_case.TestCase):
         task_scheduler.bot_update_task(
             run_result.key, 'localhost-second', 'Foo1', 0, 0, 0.1, False, False,
             0.1))
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost-second',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': now_2,
-      'costs_usd': [0., 0.1],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [0.1],
-      'exit_codes': [0],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': now_2,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': now_2,
-      'state': task_result.State.COMPLETED,
-      'try_number': 2,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        bot_id=u'localhost-second',
+        completed_ts=now_2,
+        costs_usd=[0., 0.1],
+        created_ts=self.now,
+        durations=[0.1],
+        exit_codes=[0],
+        modified_ts=now_2,
+        started_ts=now_2,
+        state=task_result.State.COMPLETED,
+        try_number=2)
     self.assertEqual(expected, run_result.result_summary_key.get().to_dict())
     self.assertEqual(0.1, run_result.key.get().cost_usd)
 
@@ -954,68 +763,31 @@ class TaskSchedulerApiTest(test_case.TestCase):
         scheduling_expiration_secs=600)
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(1, run_result.try_number)
     self.assertEqual(task_result.State.RUNNING, run_result.state)
     now_1 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 1)
     self.assertEqual((0, 1, 0), task_scheduler.cron_handle_bot_died())
 
     # Refresh and compare:
-    expected = {
-      'abandoned_ts': now_1,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'cost_usd': 0.,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008811',
-      'internal_failure': True,
-      'modified_ts': now_1,
-      'server_versions': [u'default-version'],
-      'started_ts': self.now,
-      'state': task_result.State.BOT_DIED,
-      'try_number': 1,
-    }
+    expected = _gen_run_result(
+        abandoned_ts=now_1,
+        internal_failure=True,
+        modified_ts=now_1,
+        started_ts=self.now,
+        state=task_result.State.BOT_DIED)
     self.assertEqual(expected, run_result.key.get().to_dict())
-    expected = {
-      'abandoned_ts': None,
-      'bot_id': u'localhost',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0.],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': False,
-      'modified_ts': now_1,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': None,
-      'state': task_result.State.PENDING,
-      'try_number': 1,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        created_ts=self.now,
+        modified_ts=now_1,
+        state=task_result.State.PENDING)
     self.assertEqual(expected, run_result.result_summary_key.get().to_dict())
 
     # Task was retried but the same bot polls again, it's denied the task.
     now_2 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 2)
     request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(None, request)
     self.assertEqual(None, run_result)
     logging.info('%s', [t.to_dict() for t in task_to_run.TaskToRun.query()])
@@ -1028,13 +800,8 @@ class TaskSchedulerApiTest(test_case.TestCase):
         scheduling_expiration_secs=600)
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(1, run_result.try_number)
     self.assertEqual(task_result.State.RUNNING, run_result.state)
     self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 1)
@@ -1042,34 +809,20 @@ class TaskSchedulerApiTest(test_case.TestCase):
     now_1 = self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 2)
     # It must be a different bot.
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost-second', 'abc')
+        _BOT_DIMENSIONS, 'localhost-second', 'abc')
     now_2 = self.mock_now(self.now + 2 * task_result.BOT_PING_TOLERANCE, 3)
     self.assertEqual((1, 0, 0), task_scheduler.cron_handle_bot_died())
     self.assertEqual((0, 0, 0), task_scheduler.cron_handle_bot_died())
-    expected = {
-      'abandoned_ts': now_2,
-      'bot_id': u'localhost-second',
-      'bot_version': u'abc',
-      'children_task_ids': [],
-      'completed_ts': None,
-      'costs_usd': [0., 0.],
-      'cost_saved_usd': None,
-      'created_ts': self.now,
-      'deduped_from': None,
-      'durations': [],
-      'exit_codes': [],
-      'failure': False,
-      'id': '1d69b9f088008810',
-      'internal_failure': True,
-      'modified_ts': now_2,
-      'name': u'Request name',
-      'properties_hash': None,
-      'server_versions': [u'default-version'],
-      'started_ts': now_1,
-      'state': task_result.State.BOT_DIED,
-      'try_number': 2,
-      'user': u'Jesus',
-    }
+    expected = _gen_result_summary(
+        abandoned_ts=now_2,
+        bot_id=u'localhost-second',
+        costs_usd=[0., 0.],
+        created_ts=self.now,
+        internal_failure=True,
+        modified_ts=now_2,
+        started_ts=now_1,
+        state=task_result.State.BOT_DIED,
+        try_number=2)
     self.assertEqual(expected, run_result.result_summary_key.get().to_dict())
 
   def test_cron_handle_bot_died_ignored_expired(self):
@@ -1079,18 +832,42 @@ class TaskSchedulerApiTest(test_case.TestCase):
         scheduling_expiration_secs=600)
     request = task_request.make_request(data)
     _result_summary = task_scheduler.schedule_request(request)
-    bot_dimensions = {
-      u'OS': [u'Windows', u'Windows-3.1.1'],
-      u'hostname': u'localhost',
-      u'foo': u'bar',
-    }
     _request, run_result = task_scheduler.bot_reap_task(
-        bot_dimensions, 'localhost', 'abc')
+        _BOT_DIMENSIONS, 'localhost', 'abc')
     self.assertEqual(1, run_result.try_number)
     self.assertEqual(task_result.State.RUNNING, run_result.state)
     self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 601)
     self.assertEqual((1, 0, 0), task_scheduler.cron_handle_bot_died())
 
+  def test_cron_handle_bot_died_batches(self):
+    # Process more dead bots than fit in a single batch, ending with a partial
+    # batch.
+    self.mock(random, 'getrandbits', lambda _: 0x88)
+    self.mock(task_scheduler, '_DEAD_BOT_BATCH_SIZE', 2)
+    for i in xrange(3):
+      self.mock_now(self.now, i)
+      data = _gen_request_data(
+          properties=dict(dimensions={u'OS': u'Windows-3.1.1'}),
+          scheduling_expiration_secs=600)
+      task_scheduler.schedule_request(task_request.make_request(data))
+    for i in xrange(3):
+      _request, run_result = task_scheduler.bot_reap_task(
+          _BOT_DIMENSIONS, 'localhost%d' % i, 'abc')
+      self.assertEqual(task_result.State.RUNNING, run_result.state)
+
+    # All of them are retried.
+    self.mock_now(self.now + task_result.BOT_PING_TOLERANCE, 10)
+    self.assertEqual((0, 3, 0), task_scheduler.cron_handle_bot_died())
+    for i in xrange(3):
+      _request, run_result = task_scheduler.bot_reap_task(
+          _BOT_DIMENSIONS, 'localhost-second%d' % i, 'abc')
+      self.assertEqual(2, run_result.try_number)
+
+    # All of them are killed on their second try.
+    self.mock_now(self.now + 2 * task_result.BOT_PING_TOLERANCE, 20)
+    self.assertEqual((3, 0, 0), task_scheduler.cron_handle_bot_died())
+    self.assertEqual((0, 0, 0), task_scheduler.cron_handle_bot_died())
+
   def test_search_by_name(self):
     data = _gen_request_data(
         properties=dict(dimensions={u'OS': u'Windows-3.1.1'}))
@@ -111,14 +111,22 @@ class CaptureLogs(object):
 class UTCFormatter(logging.Formatter):
   converter = time.gmtime
 
+  # Last formatted second as (seconds since epoch, str). Records come in bursts
+  # so this saves a strftime() call for most of them.
+  _last_second = (None, None)
+
   def formatTime(self, record, datefmt=None):
     """Change is ',' to '.'."""
-    ct = self.converter(record.created)
     if datefmt:
-      return time.strftime(datefmt, ct)
-    else:
-      t = time.strftime("%Y-%m-%d %H:%M:%S", ct)
-      return "%s.%03d" % (t, record.msecs)
+      return time.strftime(datefmt, self.converter(record.created))
+    second = int(record.created)
+    last_second = self._last_second
+    if last_second[0] != second:
+      last_second = (
+          second,
+          time.strftime("%Y-%m-%d %H:%M:%S", self.converter(record.created)))
+      self._last_second = last_second
+    return "%s.%03d" % (last_second[1], record.msecs)
 
 
 def find_stderr(root=None):
@@ -49,6 +49,18 @@ class TestLoggingUtils(auto_stub.TestCase):
     # tricky to do reliably.
     self.assertTrue(re.match(_LOG_HEADER + 'DEBUG foo\n$', result), result)
 
+  def test_UTCFormatter(self):
+    formatter = logging_utils.UTCFormatter('%(asctime)s')
+    def format_at(created):
+      record = logging.LogRecord('foo', logging.INFO, 'foo.py', 1, '', (), None)
+      record.created = created
+      record.msecs = (created - int(created)) * 1000
+      return formatter.format(record)
+    self.assertEqual('2009-02-13 23:31:30.000', format_at(1234567890.))
+    self.assertEqual('2009-02-13 23:31:30.500', format_at(1234567890.5))
+    self.assertEqual('2009-02-13 23:31:31.250', format_at(1234567891.25))
+    self.assertEqual('2009-02-13 23:31:30.000', format_at(1234567890.))
+
 
 if __name__ == '__main__':
   unittest.main()
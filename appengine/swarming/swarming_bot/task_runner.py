@@ -16,6 +16,7 @@ failure and to cancel this task run and ask the server to retry it.
 
 __version__ = '0.4'
 
+import Queue
 import StringIO
 import base64
 import json
@@ -24,6 +25,7 @@ import optparse
 import os
 import subprocess
 import sys
+import threading
 import time
 import zipfile
 
@@ -45,6 +47,10 @@ MAX_PACKET_INTERVAL = 30
 MIN_PACKET_INTERNAL = 10
 
 
+# Maximum number of task data zip files to download concurrently.
+MAX_CONCURRENT_DOWNLOADS = 4
+
+
 # Exit code used to indicate the task failed. Keep in sync with bot_main.py. The
 # reason for its existance is that if an exception occurs, task_runner's exit
 # code will be 1. If the process is killed, it'll likely be -9. In these cases,
@@ -67,14 +73,71 @@ def monotonic_time():
 
 
 def download_data(root_dir, files):
-  """Downloads and expands the zip files enumerated in the test run data."""
-  for data_url, _ in files:
-    logging.info('Downloading: %s', data_url)
-    content = net.url_read(data_url)
-    if content is None:
-      raise Exception('Failed to download %s' % data_url)
-    with zipfile.ZipFile(StringIO.StringIO(content)) as zip_file:
-      zip_file.extractall(root_dir)
+  """Downloads and expands the zip files enumerated in the test run data.
+
+  Up to MAX_CONCURRENT_DOWNLOADS zip files are downloaded concurrently but they
+  are expanded in order, so a file present in multiple zips ends up with the
+  content of the last one. At most MAX_CONCURRENT_DOWNLOADS zip files are kept
+  in memory at any time.
+  """
+  if not files:
+    return
+  # Each item is set to (content, exc_info) once the download completed.
+  results = [None] * len(files)
+  completed = [threading.Event() for _ in files]
+  abort = threading.Event()
+  work = Queue.Queue()
+
+  def worker():
+    while True:
+      index = work.get()
+      if index is None:
+        return
+      try:
+        if not abort.is_set():
+          data_url = files[index][0]
+          logging.info('Downloading: %s', data_url)
+          results[index] = (net.url_read(data_url), None)
+      except:  # pylint: disable=W0702
+        # Also catch what does not inherit from Exception so the error is
+        # always reported to the caller.
+        results[index] = (None, sys.exc_info())
+      finally:
+        completed[index].set()
+
+  workers = []
+  for _ in xrange(min(MAX_CONCURRENT_DOWNLOADS, len(files))):
+    thread = threading.Thread(target=worker)
+    thread.daemon = True
+    thread.start()
+    workers.append(thread)
+
+  try:
+    queued = 0
+    for index, (data_url, _) in enumerate(files):
+      # Only queue a download when there's room for its content, as the zip
+      # files are kept in memory until they are expanded.
+      while queued < len(files) and queued < index + MAX_CONCURRENT_DOWNLOADS:
+        work.put(queued)
+        queued += 1
+      # Event.wait() without a timeout can't be interrupted on python 2 so
+      # KeyboardInterrupt would be ignored until the download completes.
+      while not completed[index].wait(1.):
+        pass
+      content, exc_info = results[index]
+      results[index] = None
+      if exc_info:
+        raise exc_info[0], exc_info[1], exc_info[2]
+      if content is None:
+        raise Exception('Failed to download %s' % data_url)
+      with zipfile.ZipFile(StringIO.StringIO(content)) as zip_file:
+        zip_file.extractall(root_dir)
+  finally:
+    # Skip the downloads that were queued but not started yet in case of
+    # failure.
+    abort.set()
+    for _ in workers:
+      work.put(None)
 
 
 class TaskDetails(object):
@@ -165,7 +228,7 @@ def post_update(swarming_server, params, exit_code, stdout, output_chunk_start):
     raise ValueError(resp.get('error'))
 
 
-def should_post_update(stdout, now, last_packet):
+def should_post_update(stdout_size, now, last_packet):
   """Returns True if it's time to send a task_update packet via post_update().
 
   Sends a packet when one of this condition is met:
@@ -174,8 +237,8 @@ def should_post_update(stdout, now, last_packet):
     stdout.
   - last packet was sent more than MAX_PACKET_INTERVAL seconds ago.
   """
-  packet_interval = MIN_PACKET_INTERNAL if stdout else MAX_PACKET_INTERVAL
-  return len(stdout) >= MAX_CHUNK_SIZE or (now - last_packet) > packet_interval
+  packet_interval = MIN_PACKET_INTERNAL if stdout_size else MAX_PACKET_INTERVAL
+  return stdout_size >= MAX_CHUNK_SIZE or (now - last_packet) > packet_interval
 
 
 def calc_yield_wait(task_details, start, last_io, timed_out, stdout):
@@ -212,14 +275,12 @@ def run_command(
 
   logging.info('Executing: %s', task_details.command)
   # TODO(maruel): Support both channels independently and display stderr in red.
-  env = None
-  if task_details.env:
-    env = os.environ.copy()
-    env.update(task_details.env)
   try:
+    # TaskDetails.env is already a copy of os.environ with the task's
+    # environment variables applied.
     proc = subprocess42.Popen(
         task_details.command,
-        env=env,
+        env=task_details.env or None,
         cwd=root_dir,
         detached=True,
         stdout=subprocess.PIPE,
@@ -236,8 +297,14 @@ def run_command(
     post_update(swarming_server, params, 1, stdout, 0)
     return 1
 
+  grace_period = task_details.grace_period
+  hard_timeout = task_details.hard_timeout
+  io_timeout = task_details.io_timeout
   output_chunk_start = 0
-  stdout = ''
+  # Buffered output since the last packet. Kept as a list of chunks to not copy
+  # the whole buffer on every read.
+  stdout = []
+  stdout_size = 0
   exit_code = None
   had_hard_timeout = False
   had_io_timeout = False
@@ -245,40 +312,43 @@ def run_command(
   try:
     last_io = monotonic_time()
     for _, new_data in proc.yield_any(
-          maxsize=MAX_CHUNK_SIZE - len(stdout),
+          maxsize=MAX_CHUNK_SIZE - stdout_size,
           soft_timeout=calc_yield_wait(
               task_details, start, last_io, timed_out, stdout)):
       now = monotonic_time()
       if new_data:
-        stdout += new_data
+        stdout.append(new_data)
+        stdout_size += len(new_data)
         last_io = now
 
       # Post update if necessary.
-      if should_post_update(stdout, now, last_packet):
-        last_packet = monotonic_time()
+      if should_post_update(stdout_size, now, last_packet):
+        last_packet = now
         params['cost_usd'] = (
             cost_usd_hour * (last_packet - task_start) / 60. / 60.)
-        post_update(swarming_server, params, None, stdout, output_chunk_start)
-        output_chunk_start += len(stdout)
-        stdout = ''
+        post_update(
+            swarming_server, params, None, ''.join(stdout), output_chunk_start)
+        output_chunk_start += stdout_size
+        stdout = []
+        stdout_size = 0
 
       # Send signal on timeout if necessary. Both are failures, not
       # internal_failures.
       # Eventually kill but return 0 so bot_main.py doesn't cancel the task.
       if not timed_out:
-        if now - last_io > task_details.io_timeout:
+        if now - last_io > io_timeout:
           had_io_timeout = True
           logging.warning('I/O timeout')
           proc.terminate()
-          timed_out = monotonic_time()
-        elif now - start > task_details.hard_timeout:
+          timed_out = now
+        elif now - start > hard_timeout:
           had_hard_timeout = True
           logging.warning('Hard timeout')
           proc.terminate()
-          timed_out = monotonic_time()
+          timed_out = now
       else:
         # During grace period.
-        if now >= timed_out + task_details.grace_period:
+        if now >= timed_out + grace_period:
           # Now kill for real. The user can distinguish between the following
           # states:
           # - signal but process exited within grace period,
@@ -316,9 +386,12 @@ def run_command(
     params['io_timeout'] = had_io_timeout
     params['hard_timeout'] = had_hard_timeout
     # At worst, it'll re-throw, which will be caught by bot_main.py.
-    post_update(swarming_server, params, exit_code, stdout, output_chunk_start)
-    output_chunk_start += len(stdout)
-    stdout = ''
+    post_update(
+        swarming_server, params, exit_code, ''.join(stdout),
+        output_chunk_start)
+    output_chunk_start += stdout_size
+    stdout = []
+    stdout_size = 0
 
   logging.info('run_command() = %s', exit_code)
   assert not stdout
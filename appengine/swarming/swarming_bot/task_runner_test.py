@@ -14,6 +14,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import unittest
 import zipfile
@@ -174,6 +175,60 @@ class TestTaskRunner(TestTaskRunnerBase):
     self.assertEqual(
         ['file1', 'file2', 'file3', 'work'], sorted(os.listdir(self.root_dir)))
 
+  def test_download_data_last_wins(self):
+    # The first zip is only returned once the second one was downloaded, yet
+    # the content of the second one still overrides it.
+    second_fetched = threading.Event()
+    def url_read(url):
+      if url == 'https://localhost:1/a':
+        self.assertTrue(second_fetched.wait(5))
+        return compress_to_zip({'file1': 'a', 'file2': 'a'})
+      second_fetched.set()
+      return compress_to_zip({'file1': 'b'})
+    self.mock(task_runner.net, 'url_read', url_read)
+    items = [
+      ('https://localhost:1/a', 'a.zip'),
+      ('https://localhost:1/b', 'b.zip'),
+    ]
+    task_runner.download_data(self.root_dir, items)
+    self.assertEqual(
+        ['file1', 'file2', 'work'], sorted(os.listdir(self.root_dir)))
+    with open(os.path.join(self.root_dir, 'file1'), 'rb') as f:
+      self.assertEqual('b', f.read())
+
+  def test_download_data_fail(self):
+    def url_read(url):
+      if url == 'https://localhost:1/b':
+        raise IOError('boom 404')
+      return compress_to_zip({url[-1]: 'content'})
+    self.mock(task_runner.net, 'url_read', url_read)
+    items = [
+      ('https://localhost:1/a', 'a.zip'),
+      ('https://localhost:1/b', 'b.zip'),
+      ('https://localhost:1/c', 'c.zip'),
+    ]
+    with self.assertRaises(IOError) as cm:
+      task_runner.download_data(self.root_dir, items)
+    self.assertEqual('boom 404', str(cm.exception))
+    # The zip before the failure was expanded, the one after it was not.
+    self.assertEqual(['a', 'work'], sorted(os.listdir(self.root_dir)))
+
+  def test_download_data_fail_base_exception(self):
+    def url_read(_url):
+      raise SystemExit(3)
+    self.mock(task_runner.net, 'url_read', url_read)
+    with self.assertRaises(SystemExit):
+      task_runner.download_data(
+          self.root_dir, [('https://localhost:1/a', 'a.zip')])
+
+  def test_download_data_fail_none(self):
+    self.mock(task_runner.net, 'url_read', lambda _url: None)
+    with self.assertRaises(Exception) as cm:
+      task_runner.download_data(
+          self.root_dir, [('https://localhost:1/a', 'a.zip')])
+    self.assertEqual(
+        'Failed to download https://localhost:1/a', str(cm.exception))
+
   def test_load_and_run(self):
     requests = [
       (